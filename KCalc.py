@@ -1,12 +1,15 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-"""
+r"""
 Evaluates indefinite integrals of the form
 \int x^n j_l(ax) j_l(bx) dx
 for n=2, 4, 6 with a != b and 0 <= l <= 10 by hard-coded expressions
 Warning: do not use at x = 0!
+Runs under both Python 2 and Python 3.
 """
 
+from __future__ import print_function
+
 #Verbosity switch
 #verbose=False
 verbose=True
@@ -14,8 +17,9 @@ verbose=True
 from scipy import integrate
 from mpmath import mp
 import numpy as np
-from math import cos, sin
+from math import cos, sin, log10
 from scipy.special import spherical_jn as sphj
+import sys
 import time
 
 mp.dps=200
@@ -35,6 +39,13 @@ class Polynomial(object) :
 				self.a2 = a*a
 				self.b2 = b*b
 				self.stored = {}
+				# Powers of ab, a+b and a-b and trig factors at each x are
+				# also stored, so that integrals sharing a and b reuse them
+				self.ab = a*b
+				self.apb = a+b
+				self.amb = a-b
+				self.powers = {}
+				self.trig = {}
 
 		def get_list(self, n) :
 				if n in self.stored :
@@ -42,6 +53,26 @@ class Polynomial(object) :
 				self.stored[n] = self._make_list(n)
 				return self.stored[n]
 
+		def get_power(self, base, k) :
+				"""Returns base^k, where base is one of 'ab', 'apb' (a+b) or 'amb' (a-b)"""
+				if (base, k) not in self.powers :
+						self.powers[(base, k)] = getattr(self, base) ** k
+				return self.powers[(base, k)]
+
+		def get_trig(self, x) :
+				"""Returns cos(x(a+b)), cos(x(a-b)), sin(x(a+b)) and sin(x(a-b))"""
+				if x not in self.trig :
+						self.set_trig(x, mp.cos(x * self.apb), mp.cos(x * self.amb),
+								mp.sin(x * self.apb), mp.sin(x * self.amb))
+				return self.trig[x]
+
+		def set_trig(self, x, cosp, cosm, sinp, sinm) :
+				"""
+				Stores the trig factors at x computed elsewhere, in the order
+				returned by get_trig
+				"""
+				self.trig[x] = (cosp, cosm, sinp, sinm)
+
 		def _make_list(self, n) :
 				"""
 				Creates a list of monomials:
@@ -64,86 +95,226 @@ class Polynomial(object) :
 				coeff[0] a^2n + coeff[1] a^2(n-1) b^2 + ...
 				... + coeff[n-2] a^2 b^2(n-1) + coeff[n-1] b^2n
 				"""
-				return np.sum(coeff * self.get_list(len(coeff)))
+				return sum([c * mono for c, mono in zip(coeff, self.get_list(len(coeff)))])
+
+		def eval_poly_grad(self, coeff) :
+				"""
+				Evaluates the same polynomial as eval_poly, together with
+				its derivatives with respect to a and b
+				Returns an array (poly, d/da poly, d/db poly)
+				"""
+				k = len(coeff) - 1
+				monomials = [c * mono for c, mono in zip(coeff, self.get_list(len(coeff)))]
+				# d/da a^2(k-i) b^2i = 2(k-i)/a a^2(k-i) b^2i, and similarly for b
+				da = sum([(k - i) * mono for i, mono in enumerate(monomials)])
+				db = sum([i * mono for i, mono in enumerate(monomials)])
+				return np.array([sum(monomials), 2 * da / self.a, 2 * db / self.b])
 
 class Term(object) :
 		"""
 		Describes a term of the form
 		C x^n (ab)^m poly(a, b)
 		where poly is a polynomial in a^2 and b^2
+		C, n, m and the coefficients of poly are exact integers
 		"""
+		__slots__ = ('c', 'n', 'm', 'coeffs')
+
 		def __init__(self, c, n, m, coeffs=[1]) :
-			self.c = mp.mpf(c)
-			self.n = mp.mpf(n)
-			self.m = mp.mpf(m)
-			self.coeffs = []
-			for coeff in coeffs:
-				self.coeffs.append(mp.mpf(coeff))
+			self.c = int(c)
+			self.n = int(n)
+			self.m = int(m)
+			self.coeffs = tuple([int(coeff) for coeff in coeffs])
 
 		def evaluate(self, x, poly) :
 				"""Evaluates the term, given x and a poly object that stores a and b"""
+				return TermValue(self.c, self.n, self.m, self.coeffs, x, poly)
+
+		def prefactor(self, poly) :
+				"""Evaluates the x-independent factor C (ab)^m poly(a, b) of the term"""
+				return TermPrefactor(self.c, self.m, self.coeffs, poly)
+
+		def evaluate_grad(self, x, poly) :
+				"""
+				Evaluates the term and its derivatives with respect to a and b
+				Returns an array (term, d/da term, d/db term)
+				"""
 				xn = x ** self.n
-				abm = mp.mpf(1)
-				if self.m != 0 :
-						abm = (poly.a * poly.b) ** self.m
-				return self.c * xn * abm * poly.eval_poly(self.coeffs)
+				abm = poly.get_power('ab', self.m)
+				p, pa, pb = poly.eval_poly_grad(self.coeffs)
+				# d/da (ab)^m = m (ab)^m / a, and similarly for b
+				da = abm * (self.m * p / poly.a + pa)
+				db = abm * (self.m * p / poly.b + pb)
+				return self.c * xn * np.array([abm * p, da, db])
+
+def TermValue(c, n, m, coeffs, x, poly) :
+		"""
+		Evaluates C x^n (ab)^m poly(a, b), given x and a poly object that
+		stores a and b; shared by Term and the tables of KShared
+		"""
+		return x ** n * TermPrefactor(c, m, coeffs, poly)
+
+def TermPrefactor(c, m, coeffs, poly) :
+		"""Evaluates C (ab)^m poly(a, b), the x-independent factor of a term"""
+		return c * poly.get_power('ab', m) * poly.eval_poly(coeffs)
 
 class Part(object) :
 		"""
 		Describes a part of an integral as a sum of terms
 		"""
+		__slots__ = ('terms',)
+
 		def __init__(self, terms) :
 				"""Pass in a list of terms"""
-				self.terms = terms
+				self.terms = tuple(terms)
 
 		def evaluate(self, x, poly) :
 				"""Evaluates the part, given x and a poly object that stores a and b"""
 				return sum([term.evaluate(x, poly) for term in self.terms])
 
+		def collect(self, poly) :
+				"""
+				Gathers the x-independent factors of the terms, given a poly object
+				that stores a and b
+				Returns a dictionary mapping each power of x to its coefficient
+				"""
+				coeffs = {}
+				for term in self.terms :
+						coeffs[term.n] = coeffs.get(term.n, 0) + term.prefactor(poly)
+				return coeffs
+
+		def evaluate_grad(self, x, poly) :
+				"""
+				Evaluates the part and its derivatives with respect to a and b
+				Returns an array (part, d/da part, d/db part)
+				"""
+				return sum([term.evaluate_grad(x, poly) for term in self.terms], np.zeros(3, dtype=object))
+
 class KnlInt(object) :
 		"""
 		Describes an integral as an appropriate sum of parts
 		"""
+		__slots__ = ('n', 'l', 'parts')
+
 		def __init__(self, n, l, csum, cdiff, ssum, sdiff) :
 				"""Describe the integral, and provide a list of parts"""
-				self.n = mp.mpf(n)
-				self.l = mp.mpf(l)
-				self.parts = [csum, cdiff, ssum, sdiff]
+				self.n = int(n)
+				self.l = int(l)
+				self.parts = (csum, cdiff, ssum, sdiff)
 
 		def evaluate(self, x, poly) :
 				"""Evaluates the integral, given x and a poly object that stores a and b"""
 				# Evaluate each part (csum, cdiff, ssum, sdiff)
 				csum, cdiff, ssum, sdiff = [part.evaluate(x, poly) for part in self.parts]
 				# Compute the required coefficients
-				abl = (poly.a * poly.b) ** (self.l + mp.mpf(1))
-				apb = poly.a + poly.b
-				amb = poly.a - poly.b
+				abl = poly.get_power('ab', self.l + 1)
+				cosp, cosm, sinp, sinm = poly.get_trig(x)
 				# Evaluate each term
-				cpterm = mp.cos(x * apb) * (csum + cdiff) / apb ** (self.n - mp.mpf(2))
-				cmterm = mp.cos(x * amb) * (csum - cdiff) / amb ** (self.n - mp.mpf(2))
-				spterm = mp.sin(x * apb) * (ssum + sdiff) / apb ** (self.n - mp.mpf(1))
-				smterm = mp.sin(x * amb) * (ssum - sdiff) / amb ** (self.n - mp.mpf(1))
+				cpterm = cosp * (csum + cdiff) / poly.get_power('apb', self.n - 2)
+				cmterm = cosm * (csum - cdiff) / poly.get_power('amb', self.n - 2)
+				spterm = sinp * (ssum + sdiff) / poly.get_power('apb', self.n - 1)
+				smterm = sinm * (ssum - sdiff) / poly.get_power('amb', self.n - 1)
 				# Compute result 
 				termlist = [cpterm,cmterm,spterm,smterm]
 				termlist = [mp.mpf('0.25') / abl * term for term in termlist]
-				result = sum(termlist)
-				# Compute precision loss
-				abslist = [mp.fabs(term) for term in termlist]
-				abssum=mp.fabs(result)
-				sumabs=sum(abslist)
-				prec_loss = mp.ceil(mp.log10(sumabs/abssum))
-				prec_remaining = mp.dps - prec_loss
-				if verbose:
-					print "Precision remaining",prec_remaining
-				# Demand that at least machine precision remains FIXME: more?
-				if prec_remaining<16:
-					sys.exit("Insufficient precision")
-				# Add the lot together
-				# print mp.mpf('0.25') / abl * (cpterm + cmterm + spterm + smterm)
-				return result
+				return self._check_precision(termlist)
 
-def K2Int(l, x, poly) :
+		def evaluate_grad(self, x, poly) :
+				"""
+				Evaluates the integral and its derivatives with respect to a and b,
+				given x and a poly object that stores a and b
+				Returns a tuple (integral, d/da integral, d/db integral)
+				"""
+				# Evaluate each part (csum, cdiff, ssum, sdiff) with its gradient
+				csum, cdiff, ssum, sdiff = [part.evaluate_grad(x, poly) for part in self.parts]
+				# Compute the required coefficients
+				abl = poly.get_power('ab', self.l + 1)
+				cosp, cosm, sinp, sinm = poly.get_trig(x)
+				# Each term is trig(x s) * part / s^p with s = a+b or a-b;
+				# list trig, d/ds trig, part, s, p and d/db s (d/da s is 1)
+				pieces = [(cosp, -x * sinp, csum + cdiff, 'apb', self.n - 2, 1),
+						(cosm, -x * sinm, csum - cdiff, 'amb', self.n - 2, -1),
+						(sinp, x * cosp, ssum + sdiff, 'apb', self.n - 1, 1),
+						(sinm, x * cosm, ssum - sdiff, 'amb', self.n - 1, -1)]
+				termlist = []
+				dalist = []
+				dblist = []
+				for trig, dtrig, part, base, p, dsdb in pieces :
+						s = getattr(poly, base)
+						spow = poly.get_power(base, p)
+						# Derivative of trig(x s) / s^p with respect to s
+						ds = (dtrig - p * trig / s) * part[0] / spow
+						termlist.append(trig * part[0] / spow)
+						dalist.append(trig * part[1] / spow + ds)
+						dblist.append(trig * part[2] / spow + dsdb * ds)
+				prefactor = mp.mpf('0.25') / abl
+				result = self._check_precision([prefactor * term for term in termlist])
+				# The prefactor 1/(ab)^(l+1) contributes -(l+1)/a times the result
+				dalist = [prefactor * term for term in dalist] + [-(self.l + 1) * result / poly.a]
+				dblist = [prefactor * term for term in dblist] + [-(self.l + 1) * result / poly.b]
+				return result, self._check_precision(dalist), self._check_precision(dblist)
+
+		def evaluate_many(self, xs, poly) :
+				"""
+				Evaluates the integral at every x in xs, given a poly object that
+				stores a and b
+				All x-independent factors are computed once, so that each x only
+				costs its powers and trig functions
+				Returns a list of results in the order of xs
+				"""
+				csum, cdiff, ssum, sdiff = [part.collect(poly) for part in self.parts]
+				# Compute the required coefficients
+				abl = poly.get_power('ab', self.l + 1)
+				apb = poly.apb
+				amb = poly.amb
+				prefactor = mp.mpf('0.25') / abl
+				# Fold the prefactor and (a+-b) powers into a polynomial in x per term
+				cplus = self._fold(csum, cdiff, 1, prefactor / poly.get_power('apb', self.n - 2))
+				cminus = self._fold(csum, cdiff, -1, prefactor / poly.get_power('amb', self.n - 2))
+				splus = self._fold(ssum, sdiff, 1, prefactor / poly.get_power('apb', self.n - 1))
+				sminus = self._fold(ssum, sdiff, -1, prefactor / poly.get_power('amb', self.n - 1))
+				results = []
+				# Trig factors are not stored, as every x is distinct
+				for x in xs :
+						cpterm, cmterm, spterm, smterm = [sum([coeff * x ** k for k, coeff in part])
+								for part in [cplus, cminus, splus, sminus]]
+						termlist = [mp.cos(x * apb) * cpterm, mp.cos(x * amb) * cmterm,
+								mp.sin(x * apb) * spterm, mp.sin(x * amb) * smterm]
+						results.append(self._check_precision(termlist))
+				return results
+
+		def _fold(self, first, second, sign, factor) :
+				"""
+				Combines two collected parts as factor * (first + sign * second)
+				Returns a list of (power of x, coefficient) pairs
+				"""
+				powers = set(first) | set(second)
+				return [(k, factor * (first.get(k, 0) + sign * second.get(k, 0))) for k in sorted(powers)]
+
+		def _check_precision(self, termlist) :
+				"""Adds the terms together, see CheckPrecision"""
+				return CheckPrecision(termlist)
+
+def CheckPrecision(termlist) :
 		"""
+		Adds the terms together, demanding that enough precision
+		survives the cancellation between them
+		"""
+		result = sum(termlist)
+		# Compute precision loss
+		abslist = [mp.fabs(term) for term in termlist]
+		abssum=mp.fabs(result)
+		sumabs=sum(abslist)
+		prec_loss = mp.ceil(mp.log10(sumabs/abssum))
+		prec_remaining = mp.dps - prec_loss
+		if verbose:
+			print("Precision remaining",prec_remaining)
+		# Demand that at least machine precision remains FIXME: more?
+		if prec_remaining<16:
+			sys.exit("Insufficient precision")
+		return result
+
+def K2Int(l, x, poly) :
+		r"""
 		Computes the integral
 		\int x^2 j_l(ax) j_l(bx) dx
 		which is known analytically
@@ -157,6 +328,121 @@ def K2Int(l, x, poly) :
 				terms = b*sphj(l, a*x)*sphj(l-1, b*x) - a*sphj(l-1, a*x)*sphj(l, b*x)
 		return coeff*terms
 
+def SphericalBessels(lmax, z) :
+		"""
+		Computes j_l(z) for every l from 0 to lmax by recurrence in l,
+		returned as a list
+		The upward recurrence is stable while l < z; otherwise the list is
+		built downward (Miller's algorithm) from an order high enough for
+		the error to decay below the working precision, and normalized by
+		whichever of j_0 and j_1 is further from a zero
+		"""
+		j0 = mp.sin(z) / z
+		j1 = j0 / z - mp.cos(z) / z
+		if z > lmax :
+				bessels = [j0, j1]
+				for l in range(1, lmax) :
+						bessels.append((2*l + 1) / z * bessels[l] - bessels[l-1])
+				return bessels[:lmax+1]
+		# The error relative to j_l shrinks by about (z/(2k+1))^2 per order k
+		logz = float(mp.log10(z))
+		start = lmax + 1
+		decay = 0.0
+		while decay > -(mp.dps + 10) :
+				start += 1
+				decay += 2 * logz - log10((2*start + 1) * (2*start + 3))
+		# mpf has an unbounded exponent, so the sequence needs no rescaling
+		bessels = [mp.zero] * (start + 2)
+		bessels[start] = mp.one
+		for l in range(start, 0, -1) :
+				bessels[l-1] = (2*l + 1) / z * bessels[l] - bessels[l+1]
+		if mp.fabs(j0) >= mp.fabs(j1) :
+				scale = j0 / bessels[0]
+		else :
+				scale = j1 / bessels[1]
+		return [scale * value for value in bessels[:lmax+1]]
+
+def _Generator(n, a, b) :
+		"""
+		Returns the polynomial d(x) from which BesselForm builds the
+		antiderivative of x^n j_l(ax) j_l(bx), as the list of coefficients
+		of x^0, x^2, x^4, ... at l = 0, and the constant added to d(x) per
+		unit of l(l+1)
+		"""
+		A = a*a + b*b
+		D = a*a - b*b
+		if n == 2 :
+				return [-2 / D], 0
+		if n == 4 :
+				return [8 * A / D**3, -2 / D], 0
+		if n == 6 :
+				return [48 / D**3 - 192 * A**2 / D**5, 48 * A / D**3, -2 / D], -64 / D**3
+		raise ValueError("No Bessel form for n=%d" % n)
+
+def _EvenPoly(coeffs, x, order) :
+		"""Evaluates the order-th derivative of coeffs[0] + coeffs[1] x^2 + ... at x"""
+		total = 0
+		for k, coeff in enumerate(coeffs) :
+				factor = 1
+				for i in range(order) :
+						factor *= 2*k - i
+				if factor :
+						total += factor * coeff * x ** (2*k - order)
+		return total
+
+class BesselForm(object) :
+		"""
+		Describes the antiderivative of x^n j_l(ax) j_l(bx) at a fixed x,
+		for n = 2, 4 or 6 and any l, as
+		P u v + Q u' v + R u v' + S u' v'
+		with u = j_l(ax) and v = j_l(bx)
+		As (x^2 u')' = (l(l+1) - a^2 x^2) u, and likewise for v, all four
+		coefficients follow from one even polynomial d(x) (see _Generator):
+		S = -x^2 d' / D, s = (d'' - 2d'/x) / D, Q = x^2 (s + d) / 2,
+		R = x^2 (s - d) / 2 and P = ((A - 2l(l+1)/x^2) S - x^2 s') / 2,
+		with A = a^2 + b^2 and D = a^2 - b^2
+		l only enters d(x) through a constant, so P, Q and R are linear in
+		l(l+1) and S does not depend on l: the coefficients are computed
+		once, and each l costs a few multiplications
+		For n = 2 this is the form used by K2Int
+		"""
+		__slots__ = ('x', 'a', 'b', 'p', 'q', 'r', 's', 'pl', 'ql')
+
+		def __init__(self, n, x, a, b) :
+				coeffs, lcoeff = _Generator(n, a, b)
+				d, d1, d2, d3 = [_EvenPoly(coeffs, x, order) for order in range(4)]
+				A = a*a + b*b
+				D = a*a - b*b
+				x2 = x*x
+				s = (d2 - 2 * d1 / x) / D
+				ds = (d3 - 2 * d2 / x + 2 * d1 / x2) / D
+				self.x = x
+				self.a = a
+				self.b = b
+				# S, then P, Q and R at l = 0 and their changes per unit of l(l+1)
+				self.s = -x2 * d1 / D
+				self.p = (A * self.s - x2 * ds) / 2
+				self.q = x2 * (s + d) / 2
+				self.r = x2 * (s - d) / 2
+				self.pl = -self.s / x2
+				self.ql = x2 * lcoeff / 2
+
+		def terms(self, l, ja, jb) :
+				"""
+				Returns the four terms P u v, Q u' v, R u v' and S u' v' for l,
+				given the lists ja and jb of j_k(ax) and j_k(bx) for k up to at least l+1
+				"""
+				L = l * (l + 1)
+				u = ja[l]
+				v = jb[l]
+				# j_l'(z) = l j_l(z) / z - j_(l+1)(z)
+				du = l * u / self.x - self.a * ja[l+1]
+				dv = l * v / self.x - self.b * jb[l+1]
+				P = self.p + L * self.pl
+				Q = self.q + L * self.ql
+				R = self.r - L * self.ql
+				return [P * u * v, Q * du * v, R * u * dv, self.s * du * dv]
+
 
 
 
@@ -189,15 +475,91 @@ def Calculate(xpair,l,n,a,b):
 	mpa=mp.mpf(a)
 	mpb=mp.mpf(b)
 	mpxpair=[mp.mpf(xpair[0]),mp.mpf(xpair[1])]
-	start = time.clock()
+	start = time.time()
 	poly = Polynomial(mpa, mpb)
 	result1 = integrals[(n, l)].evaluate(mpxpair[0], poly)
 	result2 = integrals[(n, l)].evaluate(mpxpair[1], poly)
 	res = result2-result1
-	end = time.clock()
+	end = time.time()
 	adelta = end-start
 	return float(res)
 
+def CalculateMany(xs,l,n,a,b):
+	"""
+	Computes the running integral from xs[0] to every x in xs,
+	returned as a numpy array of floats (the first entry is zero)
+	"""
+	mpa=mp.mpf(a)
+	mpb=mp.mpf(b)
+	mpxs=[mp.mpf(x) for x in xs]
+	poly = Polynomial(mpa, mpb)
+	results = integrals[(n, l)].evaluate_many(mpxs, poly)
+	return np.array([float(res-results[0]) for res in results])
+
+def Sweep(xpair,lmax,n,a,b):
+	"""
+	Computes the integral over xpair for every l from 0 to lmax,
+	returned as a numpy array of floats, for n = 2, 4 or 6
+	Instead of one closed form per l, the sweep uses the Bessel form of
+	the antiderivative (see BesselForm): j_l(ax) and j_l(bx) at each
+	endpoint come from one stable recurrence in l (see SphericalBessels),
+	after which each l costs a few multiplications
+	lmax is not limited by the tabulated closed forms
+	"""
+	if n not in (2, 4, 6):
+		raise ValueError("Sweep covers n=2, 4 and 6, not n=%d" % n)
+	mpa=mp.mpf(a)
+	mpb=mp.mpf(b)
+	mpxpair=[mp.mpf(xpair[0]),mp.mpf(xpair[1])]
+	forms=[BesselForm(n, x, mpa, mpb) for x in mpxpair]
+	bessels=[(SphericalBessels(lmax+1, mpa*x), SphericalBessels(lmax+1, mpb*x)) for x in mpxpair]
+	results = []
+	for l in range(lmax+1):
+		result1, result2 = [CheckPrecision(form.terms(l, ja, jb))
+			for form, (ja, jb) in zip(forms, bessels)]
+		results.append(float(result2-result1))
+	return np.array(results)
+
+def CalculateGrid(xpair,l,n,ks):
+	"""
+	Computes the integral over xpair for every pair (a, b) = (ks[i], ks[j]),
+	returned as a symmetric numpy array
+	The closed forms do not cover a == b, so those entries are left as nan
+	cos(x k) and sin(x k) are computed once per endpoint and k, and the
+	trig factors of each pair are assembled from them by angle addition
+	"""
+	mpks=[mp.mpf(k) for k in ks]
+	mpxpair=[mp.mpf(xpair[0]),mp.mpf(xpair[1])]
+	trig=[[mp.cos_sin(x*k) for k in mpks] for x in mpxpair]
+	count=len(mpks)
+	results=np.full((count,count),np.nan)
+	for i in range(count):
+		for j in range(i+1,count):
+			if mpks[i]==mpks[j]:
+				continue
+			poly = Polynomial(mpks[i], mpks[j])
+			for x, trigs in zip(mpxpair, trig):
+				ca, sa = trigs[i]
+				cb, sb = trigs[j]
+				poly.set_trig(x, ca*cb - sa*sb, ca*cb + sa*sb, sa*cb + ca*sb, sa*cb - ca*sb)
+			result1 = integrals[(n, l)].evaluate(mpxpair[0], poly)
+			result2 = integrals[(n, l)].evaluate(mpxpair[1], poly)
+			results[i,j] = results[j,i] = float(result2-result1)
+	return results
+
+def CalculateGrad(xpair,l,n,a,b):
+	"""
+	Computes the integral over xpair together with its derivatives
+	with respect to a and b, returned as a tuple of floats
+	"""
+	mpa=mp.mpf(a)
+	mpb=mp.mpf(b)
+	mpxpair=[mp.mpf(xpair[0]),mp.mpf(xpair[1])]
+	poly = Polynomial(mpa, mpb)
+	result1 = integrals[(n, l)].evaluate_grad(mpxpair[0], poly)
+	result2 = integrals[(n, l)].evaluate_grad(mpxpair[1], poly)
+	return tuple([float(r2-r1) for r1, r2 in zip(result1, result2)])
+
 #-----------------------------------------------------------------------------
 # Integral Coefficients Below
 
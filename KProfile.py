@@ -0,0 +1,148 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Profiling hooks for KCalc.
+
+Enable wraps the stages of the evaluation (monomial lists, polynomial
+contractions, power ladders, trig factors, terms, parts, precision
+checks and whole integrals) with timers that record the number of
+calls, the inclusive time and the self time, i.e. excluding nested
+stages. Disable restores the original methods, so the hooks cost
+nothing when off. The timers add some overhead per call, which inflates
+the stages called most often; the cProfile and sampling modes of Run
+give independent views of the same workload.
+The hooks are not thread-safe.
+"""
+
+import KCalc
+import cProfile
+import pstats
+import signal
+from timeit import default_timer as timer
+
+# io.StringIO also exists under Python 2, but only accepts unicode
+try:
+	from StringIO import StringIO
+except ImportError:
+	from io import StringIO
+
+#Stage label for each wrapped method
+stages = [(KCalc.Polynomial, '_make_list', 'monomial lists'),
+	(KCalc.Polynomial, 'eval_poly', 'polynomial contraction'),
+	(KCalc.Polynomial, 'get_power', 'power ladders'),
+	(KCalc.Polynomial, 'get_trig', 'trig factors'),
+	(KCalc.Term, 'evaluate', 'terms'),
+	(KCalc.Part, 'evaluate', 'parts'),
+	(KCalc.KnlInt, '_check_precision', 'precision check'),
+	(KCalc.KnlInt, 'evaluate', 'integral')]
+
+#Stage statistics: label -> [calls, inclusive seconds, self seconds]
+timings = {}
+
+#Original methods while the hooks are enabled
+_originals = []
+
+#Time spent in nested stages, one entry per active stage
+_stack = []
+
+def _Wrap(label, method):
+	def wrapper(*args, **kwargs):
+		_stack.append(0.0)
+		start = timer()
+		try:
+			return method(*args, **kwargs)
+		finally:
+			elapsed = timer() - start
+			nested = _stack.pop()
+			stat = timings.setdefault(label, [0, 0.0, 0.0])
+			stat[0] += 1
+			stat[1] += elapsed
+			stat[2] += elapsed - nested
+			if _stack:
+				_stack[-1] += elapsed
+	return wrapper
+
+def Enable():
+	"""Wraps the evaluation stages with timers"""
+	if _originals:
+		return
+	for owner, name, label in stages:
+		method = owner.__dict__[name]
+		_originals.append((owner, name, method))
+		setattr(owner, name, _Wrap(label, method))
+
+def Disable():
+	"""Restores the original methods"""
+	while _originals:
+		owner, name, method = _originals.pop()
+		setattr(owner, name, method)
+
+def Reset():
+	timings.clear()
+
+def StageReport(total):
+	"""Ranks the stages by self time, given the total wall time"""
+	lines = ["%-24s %10s %12s %12s %12s %7s" % ("Stage", "Calls", "Self [s]",
+		"Incl. [s]", "Per call [us]", "Self %")]
+	ranked = sorted(timings.items(), key=lambda item: -item[1][2])
+	for label, (calls, inclusive, own) in ranked:
+		lines.append("%-24s %10d %12.4f %12.4f %12.2f %6.1f%%" % (label, calls, own,
+			inclusive, 1e6 * inclusive / calls, 100.0 * own / total))
+	lines.append("%-24s %10s %12.4f" % ("total", "", total))
+	return "\n".join(lines)
+
+def _Sample(interval, workload):
+	"""
+	Runs workload under a sampling profiler, recording the innermost
+	KCalc function every interval seconds of CPU time
+	Returns a dictionary mapping (function, line) to sample counts
+	"""
+	samples = {}
+	def handler(signum, frame):
+		# Attribute the sample to the innermost frame inside KCalc
+		while frame is not None and frame.f_globals.get('__name__') != 'KCalc':
+			frame = frame.f_back
+		if frame is None:
+			key = ('<outside KCalc>', 0)
+		else:
+			key = (frame.f_code.co_name, frame.f_lineno)
+		samples[key] = samples.get(key, 0) + 1
+	previous = signal.signal(signal.SIGPROF, handler)
+	signal.setitimer(signal.ITIMER_PROF, interval, interval)
+	try:
+		workload()
+	finally:
+		signal.setitimer(signal.ITIMER_PROF, 0, 0)
+		signal.signal(signal.SIGPROF, previous)
+	return samples
+
+def Run(workload, mode='stages', limit=25, interval=0.001):
+	"""
+	Profiles a call of workload() and returns a ranked report as a string
+	mode is 'stages' (the timers above), 'cprofile' or 'sampling'
+	"""
+	if mode == 'stages':
+		Reset()
+		Enable()
+		try:
+			start = timer()
+			workload()
+			total = timer() - start
+		finally:
+			Disable()
+		return StageReport(total)
+	if mode == 'cprofile':
+		profile = cProfile.Profile()
+		profile.runcall(workload)
+		stream = StringIO()
+		pstats.Stats(profile, stream=stream).sort_stats('tottime').print_stats(limit)
+		return stream.getvalue()
+	if mode == 'sampling':
+		samples = _Sample(interval, workload)
+		total = sum(samples.values())
+		lines = ["%-32s %6s %8s %7s" % ("Function", "Line", "Samples", "%")]
+		ranked = sorted(samples.items(), key=lambda item: -item[1])[:limit]
+		for (name, line), count in ranked:
+			lines.append("%-32s %6d %8d %6.1f%%" % (name, line, count, 100.0 * count / total))
+		return "\n".join(lines)
+	raise ValueError("Unknown profiling mode " + mode)
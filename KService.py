@@ -0,0 +1,198 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Evaluation service answering KCalc.Calculate requests off the caller's thread.
+
+Requests are collected for a short window and evaluated together as one
+batch (by default through KThread.CalculateBatch) on an executor thread.
+A request identical to one already queued or in flight, i.e. with the
+same (n, l, a, b, xpair), is coalesced onto it instead of being
+evaluated again.
+A call that fails only fails its own requests: the backend may return
+an exception in place of a result, and if it raises for the batch as a
+whole, the calls of that batch are retried one by one.
+submit returns a Request, a minimal thread-safe future. submit_async
+wraps it in an asyncio future bound to an event loop, so that services
+built on asyncio never block the loop on a long evaluation; it needs
+Python 3, under which KCalc also runs.
+Test_KService.py exercises both paths in process.
+"""
+
+import KThread
+import threading
+from multiprocessing.pool import ThreadPool
+
+class Request(object) :
+		"""
+		Result of a submitted evaluation, filled in by the service
+		"""
+		def __init__(self) :
+				self._event = threading.Event()
+				self._lock = threading.Lock()
+				self._callbacks = []
+				self._result = None
+				self._exception = None
+
+		def done(self) :
+				return self._event.is_set()
+
+		def result(self, timeout=None) :
+				"""Waits for the evaluation, raising its exception if it failed"""
+				if not self._event.wait(timeout) :
+						raise RuntimeError("Timed out waiting for evaluation")
+				if self._exception is not None :
+						raise self._exception
+				return self._result
+
+		def add_done_callback(self, fn) :
+				"""Calls fn(request) once the result is available"""
+				with self._lock :
+						if not self._event.is_set() :
+								self._callbacks.append(fn)
+								return
+				fn(self)
+
+		def _set(self, result, exception) :
+				with self._lock :
+						self._result = result
+						self._exception = exception
+						self._event.set()
+						callbacks = self._callbacks
+						self._callbacks = []
+				for fn in callbacks :
+						fn(self)
+
+def _Backend(jobs):
+	"""
+	Default backend: KThread.CalculateBatch, with each failed call
+	returned as its exception in place of a result
+	"""
+	results, fallbacks, errors = KThread.CalculateBatch(jobs)
+	return [errors.get(i, result) for i, result in enumerate(results)]
+
+def _Outcome(result):
+	"""Returns the (result, exception) pair to set a Request with, given a backend result"""
+	# Clients get an ordinary exception, not one that ends their thread
+	if isinstance(result, SystemExit):
+		return None, ArithmeticError(str(result))
+	if isinstance(result, BaseException):
+		return None, result
+	try:
+		return float(result), None
+	except Exception:
+		return None, TypeError("Backend returned %r in place of a result" % (result,))
+
+def _Checked(results, jobs):
+	"""Returns the backend results as a list, checking there is one per job"""
+	results = list(results)
+	if len(results) != len(jobs):
+		raise ValueError("Backend returned %d results for %d calls" % (len(results), len(jobs)))
+	return results
+
+def _Transfer(request, future):
+	"""Copies a finished Request into an asyncio future"""
+	if future.cancelled():
+		return
+	try:
+		future.set_result(request.result())
+	except Exception as exc:
+		future.set_exception(exc)
+
+class Service(object) :
+		"""
+		Coalescing, micro-batching front end to a batch evaluator
+		window is the time in seconds a batch stays open after its first
+		request; backend maps a list of (xpair,l,n,a,b) tuples to results,
+		where an exception instance in place of a result fails that call only
+		"""
+		def __init__(self, window=0.005, workers=1, backend=_Backend) :
+				self.window = window
+				self.backend = backend
+				self.executor = ThreadPool(workers)
+				self.lock = threading.Lock()
+				# Requests queued or in flight, by key
+				self.pending = {}
+				# Keys waiting for the next batch
+				self.queue = []
+				self.timer = None
+				self.closed = False
+				# Statistics
+				self.batches = 0
+				self.coalesced = 0
+
+		def submit(self, xpair, l, n, a, b) :
+				"""Queues an evaluation of KCalc.Calculate(xpair,l,n,a,b)"""
+				key = (float(xpair[0]), float(xpair[1]), int(l), int(n), float(a), float(b))
+				with self.lock :
+						if self.closed :
+								raise RuntimeError("Service is closed")
+						if key in self.pending :
+								self.coalesced += 1
+								return self.pending[key]
+						request = Request()
+						self.pending[key] = request
+						self.queue.append(key)
+						# The first request of a batch opens the window
+						if self.timer is None :
+								self.timer = threading.Timer(self.window, self._flush)
+								self.timer.daemon = True
+								self.timer.start()
+						return request
+
+		def submit_async(self, xpair, l, n, a, b, loop=None) :
+				"""
+				Queues an evaluation, returning an asyncio future bound to loop
+				(by default the running event loop, so without loop it must be
+				called from code running in that loop)
+				"""
+				import asyncio
+				if loop is None :
+						loop = asyncio.get_running_loop()
+				future = loop.create_future()
+				request = self.submit(xpair, l, n, a, b)
+				request.add_done_callback(
+						lambda request : loop.call_soon_threadsafe(_Transfer, request, future))
+				return future
+
+		def close(self) :
+				"""Evaluates anything still queued, then shuts down the executor"""
+				with self.lock :
+						self.closed = True
+						if self.timer is not None :
+								self.timer.cancel()
+						self._dispatch()
+				self.executor.close()
+				self.executor.join()
+
+		def _flush(self) :
+				with self.lock :
+						self._dispatch()
+
+		def _dispatch(self) :
+				"""Hands the queued keys to the executor as one batch; call with the lock held"""
+				keys = self.queue
+				self.queue = []
+				self.timer = None
+				if keys :
+						self.executor.apply_async(self._run, (keys,))
+
+		def _run(self, keys) :
+				jobs = [((key[0], key[1]), key[2], key[3], key[4], key[5]) for key in keys]
+				try :
+						results = _Checked(self.backend(jobs), jobs)
+				# KCalc signals insufficient precision through sys.exit
+				except (Exception, SystemExit) :
+						results = [self._run_one(job) for job in jobs]
+				with self.lock :
+						requests = [self.pending.pop(key) for key in keys]
+						self.batches += 1
+				for request, result in zip(requests, results) :
+						result, exception = _Outcome(result)
+						request._set(result, exception)
+
+		def _run_one(self, job) :
+				"""Evaluates a single call, returning its result or its exception"""
+				try :
+						return _Checked(self.backend([job]), [job])[0]
+				except (Exception, SystemExit) as exc :
+						return exc
@@ -0,0 +1,233 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Multi-process evaluation of batches of KCalc.Calculate calls over shared memory.
+
+The coefficient tables in KCalc.integrals are compiled once into flat
+int64 arrays and published, together with the inputs and the output
+array of a batch, through shared memory: multiprocessing.shared_memory
+where available (Python 3.8 on), RawArray otherwise. Workers read
+the tables and inputs through zero-copy NumPy views and write their
+results straight into the shared output, so the only traffic over the
+queues is the (start, stop) indices of each tile on the way out, and
+on the way back the tile with the errors of its failed calls, if any.
+A failed call is left as nan and does not affect the rest of the batch.
+Workers are always forked, whatever the default start method (spawn on
+macOS, forkserver on Linux from Python 3.14): a spawned worker would
+import KCalc again and rebuild the tables this module exists to share.
+Forked workers inherit the shared memory and KCalc as loaded in the
+parent; KCalc.verbose is passed down explicitly. This module therefore
+needs a platform with fork.
+"""
+
+import KCalc
+import atexit
+import ctypes
+import numpy as np
+import multiprocessing
+import pickle
+from multiprocessing.sharedctypes import RawArray
+
+try:
+	from queue import Empty
+except ImportError:
+	from Queue import Empty
+
+try:
+	from multiprocessing import shared_memory
+except ImportError:
+	shared_memory = None
+
+try:
+	context = multiprocessing.get_context('fork')
+except AttributeError:
+	# Python 2 always forks on POSIX
+	context = multiprocessing
+
+class SharedArray(object) :
+		"""
+		Copy of a NumPy array in memory shared with forked workers
+		The storage is sized from the array's dtype, and array is a view of
+		it with that same dtype, so storage and view always agree
+		"""
+		def __init__(self, array) :
+				array = np.ascontiguousarray(array)
+				size = max(array.nbytes, 1)
+				if shared_memory is not None :
+						self.block = shared_memory.SharedMemory(create=True, size=size)
+						# Workers inherit the mapping rather than attaching by name,
+						# so the name can go at once and nothing outlives the process
+						self.block.unlink()
+						buffer = self.block.buf
+				else :
+						self.block = None
+						buffer = RawArray(ctypes.c_byte, size)
+				self.array = np.frombuffer(buffer, dtype=array.dtype,
+						count=array.size).reshape(array.shape)
+				self.array[...] = array
+
+		def release(self) :
+				"""Unmaps the shared memory; the array must not be used afterwards"""
+				self.array = None
+				if self.block is not None :
+						self.block.close()
+
+class Tables(object) :
+		"""
+		Compiled integral tables in shared memory
+		terms holds one row (C, n, m, offset, count) per Term, with its
+		polynomial coefficients at coeffs[offset:offset+count]; parts
+		holds one row (n, l, part, start, stop) per Part, its terms being
+		terms[start:stop]
+		"""
+		def __init__(self, integrals) :
+				terms = []
+				coeffs = []
+				parts = []
+				for (n, l), integral in sorted(integrals.items()) :
+						for index, part in enumerate(integral.parts) :
+								parts.append((n, l, index, len(terms), len(terms) + len(part.terms)))
+								for term in part.terms :
+										terms.append((term.c, term.n, term.m, len(coeffs), len(term.coeffs)))
+										coeffs.extend(term.coeffs)
+				self.terms = SharedArray(np.array(terms, dtype=np.int64).reshape(len(terms), 5))
+				self.coeffs = SharedArray(np.array(coeffs, dtype=np.int64))
+				self.parts = SharedArray(np.array(parts, dtype=np.int64).reshape(len(parts), 5))
+
+		def attach(self) :
+				"""
+				Returns KnlInt objects whose parts read from the shared tables,
+				keyed by (n, l) like KCalc.integrals
+				"""
+				terms = self.terms.array
+				coeffs = self.coeffs.array
+				parts = {}
+				for n, l, index, start, stop in self.parts.array.tolist() :
+						parts.setdefault((n, l), [None] * 4)[index] = SharedPart(terms[start:stop], coeffs)
+				return dict([(key, KCalc.KnlInt(key[0], key[1], *value))
+						for key, value in parts.items()])
+
+		def release(self) :
+				"""Unmaps the shared tables"""
+				for shared in (self.terms, self.coeffs, self.parts) :
+						shared.release()
+
+class SharedPart(object) :
+		"""
+		Describes a part of an integral as a view of rows in the shared term table
+		"""
+		__slots__ = ('terms', 'coeffs')
+
+		def __init__(self, terms, coeffs) :
+				self.terms = terms
+				self.coeffs = coeffs
+
+		def evaluate(self, x, poly) :
+				"""Evaluates the part, given x and a poly object that stores a and b"""
+				total = 0
+				for c, n, m, offset, count in self.terms.tolist() :
+						coeffs = self.coeffs[offset:offset+count].tolist()
+						total += KCalc.TermValue(c, n, m, coeffs, x, poly)
+				return total
+
+#Tables published by the first call, inherited by every worker
+published = None
+
+def Publish():
+	"""Compiles KCalc.integrals into shared memory, once"""
+	global published
+	if published is None:
+		published = Tables(KCalc.integrals)
+		# Unmap before interpreter shutdown, while no views of the tables remain
+		atexit.register(published.release)
+	return published
+
+def _Portable(exc):
+	"""Returns exc if it can be sent to the parent, else a RuntimeError describing it"""
+	try:
+		pickle.loads(pickle.dumps(exc))
+		return exc
+	except Exception:
+		return RuntimeError(repr(exc))
+
+def _Worker(tables, inputs, keys, output, queue, done, verbose):
+	"""
+	Evaluates tiles of the batch until it receives None, putting each
+	finished tile on done with a dictionary of its errors by job index
+	"""
+	KCalc.verbose = verbose
+	integrals = tables.attach()
+	inputs = inputs.array
+	keys = keys.array
+	output = output.array
+	while True:
+		tile = queue.get()
+		if tile is None:
+			return
+		errors = {}
+		for i in range(*tile):
+			try:
+				x1, x2, a, b = [KCalc.mp.mpf(value) for value in inputs[i]]
+				n, l = keys[i].tolist()
+				poly = KCalc.Polynomial(a, b)
+				result1 = integrals[(n, l)].evaluate(x1, poly)
+				result2 = integrals[(n, l)].evaluate(x2, poly)
+				output[i] = float(result2-result1)
+			# KCalc signals insufficient precision through sys.exit
+			except (Exception, SystemExit) as exc:
+				output[i] = np.nan
+				errors[i] = _Portable(exc)
+		done.put((tile, errors))
+
+def CalculateShared(jobs, processes=None, tile=64):
+	"""
+	Evaluates a list of KCalc.Calculate argument tuples (xpair,l,n,a,b)
+	on a pool of forked worker processes.
+	Work is handed out in tiles of consecutive jobs.
+	Returns a tuple (results, errors): a numpy array of results in order,
+	and a dictionary of the exceptions raised by failed calls, by index,
+	whose results are nan. Raises RuntimeError, naming the jobs left
+	unfinished, if a worker process dies.
+	"""
+	jobs = list(jobs)
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+	tables = Publish()
+	count = len(jobs)
+	inputs = SharedArray(np.array([(xpair[0], xpair[1], a, b)
+		for xpair, l, n, a, b in jobs], dtype=np.float64).reshape(count, 4))
+	keys = SharedArray(np.array([(n, l) for xpair, l, n, a, b in jobs],
+		dtype=np.int64).reshape(count, 2))
+	output = SharedArray(np.zeros(count, dtype=np.float64))
+	queue = context.Queue()
+	done = context.Queue()
+	pending = set()
+	for start in range(0, count, tile):
+		pending.add((start, min(start+tile, count)))
+		queue.put((start, min(start+tile, count)))
+	workers = [context.Process(target=_Worker,
+		args=(tables, inputs, keys, output, queue, done, KCalc.verbose)) for _ in range(processes)]
+	for worker in workers:
+		worker.start()
+		queue.put(None)
+	# Collect the finished tiles, until none are left or no worker is left to finish them
+	errors = {}
+	while pending:
+		try:
+			finished, failed = done.get(timeout=0.1)
+		except Empty:
+			if not any([worker.is_alive() for worker in workers]) and done.empty():
+				break
+			continue
+		pending.discard(tuple(finished))
+		errors.update(failed)
+	for worker in workers:
+		worker.join()
+	results = output.array.copy()
+	for shared in (inputs, keys, output):
+		shared.release()
+	if pending:
+		codes = sorted(set([worker.exitcode for worker in workers]) - set([0]))
+		raise RuntimeError("Shared-memory worker failed (exit codes %s); jobs left unfinished: %s"
+			% (codes, ", ".join(["%d-%d" % (start, stop-1) for start, stop in sorted(pending)])))
+	return results, errors
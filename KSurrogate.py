@@ -0,0 +1,165 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+r"""
+Tabulated surrogates for KCalc.Calculate.
+
+For fixed (n, l) and fixed endpoints (x1, x2) the integral
+\int_{x1}^{x2} x^n j_l(ax) j_l(bx) dx
+is a smooth function of (a, b). A Table samples KCalc.Calculate on a
+tensor grid of Chebyshev nodes in (log a, log b) and stores the
+coefficients of the interpolating Chebyshev series, together with an
+error estimate measured against exact evaluations on a denser check
+grid and widened by a safety factor. The estimate is empirical, not a
+certified bound. A Surrogate holds a collection of tables and answers
+lookups through the same interface as KCalc.Calculate, falling back to
+exact evaluation outside the tabulated domains and wherever the error
+estimate of a table exceeds the tolerance of the surrogate.
+Warning: the closed forms require a != b, so a table domain may
+not place a node on the diagonal a == b.
+"""
+
+import KCalc
+import numpy as np
+from numpy.polynomial import chebyshev
+
+#Factor applied to the largest error found on the check grid
+safety = 2.0
+
+def _Nodes(npts):
+	"""Chebyshev points of the first kind on [-1, 1]"""
+	return np.cos(np.pi*(np.arange(npts)+0.5)/npts)
+
+def _Transform(npts):
+	"""
+	Matrix taking values at the npts Chebyshev nodes to the
+	coefficients of the interpolating Chebyshev series
+	"""
+	theta = np.pi*(np.arange(npts)+0.5)/npts
+	mat = 2.0/npts*np.cos(np.outer(np.arange(npts), theta))
+	mat[0] *= 0.5
+	return mat
+
+class Table(object) :
+		"""
+		Chebyshev surrogate of KCalc.Calculate for one (n, l, xpair)
+		over the rectangle adomain x bdomain
+		"""
+		def __init__(self, xpair, l, n, adomain, bdomain, coeffs, abserr) :
+				self.xpair = (float(xpair[0]), float(xpair[1]))
+				self.l = int(l)
+				self.n = int(n)
+				self.adomain = (float(adomain[0]), float(adomain[1]))
+				self.bdomain = (float(bdomain[0]), float(bdomain[1]))
+				self.coeffs = np.asarray(coeffs, dtype=float)
+				# Estimated maximum absolute error, see Build
+				self.abserr = float(abserr)
+
+		def key(self) :
+				return (self.n, self.l) + self.xpair
+
+		def covers(self, a, b) :
+				"""Whether (a, b) lies inside the tabulated rectangle"""
+				return (self.adomain[0] <= a <= self.adomain[1] and
+						self.bdomain[0] <= b <= self.bdomain[1])
+
+		def evaluate(self, a, b) :
+				"""Evaluates the Chebyshev series at (a, b)"""
+				ta = _Scale(np.log(a), self.adomain)
+				tb = _Scale(np.log(b), self.bdomain)
+				return chebyshev.chebval2d(ta, tb, self.coeffs)
+
+def _Scale(loga, domain):
+	"""Maps log(a) from log(domain) onto [-1, 1]"""
+	lo = np.log(domain[0])
+	hi = np.log(domain[1])
+	return (2.0*loga-lo-hi)/(hi-lo)
+
+def _Sample(xpair, l, n, adomain, bdomain, ta, tb):
+	"""Evaluates KCalc.Calculate on the tensor grid of nodes ta x tb"""
+	loga = np.log(adomain)
+	logb = np.log(bdomain)
+	avals = np.exp(0.5*(loga[0]+loga[1]) + 0.5*(loga[1]-loga[0])*ta)
+	bvals = np.exp(0.5*(logb[0]+logb[1]) + 0.5*(logb[1]-logb[0])*tb)
+	values = np.empty((len(avals), len(bvals)))
+	for i, a in enumerate(avals):
+		for j, b in enumerate(bvals):
+			if a == b:
+				raise ValueError("Surrogate node on the diagonal a == b")
+			values[i, j] = KCalc.Calculate(xpair, l, n, a, b)
+	return values
+
+def Build(xpair, l, n, adomain, bdomain, npts=(16, 16)):
+	"""
+	Tabulates KCalc.Calculate for a given (n, l, xpair) over
+	adomain x bdomain using npts Chebyshev nodes in each of log a and log b.
+	The error estimate is the larger of the maximum error found on a check
+	grid and the magnitude of the trailing Chebyshev coefficients, times
+	safety. The check grid has 2*npts+1 equally spaced points in each of
+	log a and log b, edges included: it is denser than the interpolation
+	grid, and it samples the edges and corners of the domain, where the
+	interpolation error is largest. This is a checked estimate rather
+	than a rigorous bound, and it costs about four times the sampling of
+	the table itself.
+	"""
+	na, nb = npts
+	values = _Sample(xpair, l, n, adomain, bdomain, _Nodes(na), _Nodes(nb))
+	coeffs = np.dot(np.dot(_Transform(na), values), _Transform(nb).T)
+	table = Table(xpair, l, n, adomain, bdomain, coeffs, 0.0)
+	# Compare against exact evaluations on a denser grid that reaches the edges
+	ta = np.linspace(-1.0, 1.0, 2*na+1)
+	tb = np.linspace(-1.0, 1.0, 2*nb+1)
+	exact = _Sample(xpair, l, n, adomain, bdomain, ta, tb)
+	approx = chebyshev.chebgrid2d(ta, tb, coeffs)
+	checkerr = np.max(np.abs(exact-approx))
+	tailerr = np.sum(np.abs(coeffs[-1, :])) + np.sum(np.abs(coeffs[:, -1]))
+	table.abserr = safety*max(checkerr, tailerr)
+	return table
+
+class Surrogate(object) :
+		"""
+		Collection of tables answering KCalc.Calculate-style lookups.
+		A table is used only if it covers (a, b) and its error estimate
+		is within the absolute tolerance tol; otherwise the integral is
+		evaluated exactly.
+		"""
+		def __init__(self, tables, tol) :
+				self.tol = tol
+				self.tables = {}
+				for table in tables:
+						self.add(table)
+
+		def add(self, table) :
+				self.tables.setdefault(table.key(), []).append(table)
+
+		def Calculate(self, xpair, l, n, a, b) :
+				key = (int(n), int(l), float(xpair[0]), float(xpair[1]))
+				for table in self.tables.get(key, []):
+						if table.abserr > self.tol:
+								continue
+						if table.covers(a, b):
+								return float(table.evaluate(a, b))
+				return KCalc.Calculate(xpair, l, n, a, b)
+
+		def save(self, filename) :
+				"""Stores all tables in a single .npz file"""
+				arrays = {}
+				tables = [table for group in self.tables.values() for table in group]
+				arrays['ntables'] = np.array(len(tables))
+				for i, table in enumerate(tables):
+						arrays['key%d' % i] = np.array([table.n, table.l])
+						arrays['domain%d' % i] = np.array([table.xpair,
+								table.adomain, table.bdomain])
+						arrays['coeffs%d' % i] = table.coeffs
+						arrays['abserr%d' % i] = np.array(table.abserr)
+				np.savez(filename, **arrays)
+
+def Load(filename, tol):
+	"""Reads tables stored by Surrogate.save into a Surrogate with tolerance tol"""
+	data = np.load(filename)
+	tables = []
+	for i in range(int(data['ntables'])):
+		n, l = data['key%d' % i]
+		xpair, adomain, bdomain = data['domain%d' % i]
+		tables.append(Table(xpair, l, n, adomain, bdomain,
+			data['coeffs%d' % i], data['abserr%d' % i]))
+	return Surrogate(tables, tol)
@@ -0,0 +1,37 @@
+#! /usr/bin/python
+
+"""
+Script to produce a ranked hot-path report for a standard workload
+of analytic integrals, to drive and verify optimization work.
+Usage: Profile_KCalc.py [stages|cprofile|sampling]
+"""
+
+from __future__ import print_function
+import KCalc
+import KProfile
+import sys
+
+#Precision logs are off by default, as they dominate the report otherwise
+KCalc.verbose=False
+
+#Standard workload: the comparison values of Test_KCalc, for n=4 and 6
+nlist=[4,6]
+llist=range(0,11)
+radii=[(0.01,50.0),(0.3,1.7),(2.0,0.5)]
+xpair=(1e-3,1e3)
+repeats=3
+
+def Workload():
+	for _ in range(repeats):
+		for n in nlist:
+			for l in llist:
+				for a,b in radii:
+					KCalc.Calculate(xpair,l,n,a,b)
+
+mode='stages'
+if len(sys.argv)>1:
+	mode=sys.argv[1]
+
+print("Workload: ",repeats*len(nlist)*len(llist)*len(radii)," integrals, mode",mode)
+print()
+print(KProfile.Run(Workload,mode))
@@ -0,0 +1,68 @@
+#! /usr/bin/python
+
+"""
+Script to check the gradient returned by KCalc.CalculateGrad, against
+central finite differences of the analytic integrals at full mpmath
+precision and against quadrature of the differentiated integrand.
+"""
+
+from __future__ import print_function
+import KCalc
+from mpmath import mp
+from scipy import integrate
+from scipy.special import spherical_jn as sphj
+import sys
+
+KCalc.verbose=False
+
+#Testing values: (n, l, a, b, xpair)
+cases=[(4,3,0.3,1.7,(0.1,5.0)),
+	(6,8,0.01,50.0,(1e-3,1e3)),
+	(6,0,2.0,0.5,(0.2,3.0)),
+	(4,10,1.3,0.4,(1.0,20.0))]
+
+#Finite difference step, far below the 200 digit working precision
+step=mp.mpf('1e-40')
+
+#Maximum number of quadrature subdivisions.
+intlimit=1000
+
+def Antiderivative(x1,x2,n,l,a,b):
+	poly=KCalc.Polynomial(a,b)
+	return KCalc.integrals[(n,l)].evaluate(x2,poly)-KCalc.integrals[(n,l)].evaluate(x1,poly)
+
+#Derivatives of the integrand with respect to a and b
+def IntegrandA(x,n,l,a,b):
+	return x**(n+1)*sphj(l,a*x,derivative=True)*sphj(l,b*x)
+
+def IntegrandB(x,n,l,a,b):
+	return x**(n+1)*sphj(l,a*x)*sphj(l,b*x,derivative=True)
+
+maxdiff=0.0
+maxquad=0.0
+for n,l,a,b,xpair in cases:
+	value,da,db=KCalc.CalculateGrad(xpair,l,n,a,b)
+	x1,x2=[mp.mpf(x) for x in xpair]
+	mpa,mpb=mp.mpf(a),mp.mpf(b)
+	fda=(Antiderivative(x1,x2,n,l,mpa+step,mpb)-Antiderivative(x1,x2,n,l,mpa-step,mpb))/(2*step)
+	fdb=(Antiderivative(x1,x2,n,l,mpa,mpb+step)-Antiderivative(x1,x2,n,l,mpa,mpb-step))/(2*step)
+	diffs=[abs(value-KCalc.Calculate(xpair,l,n,a,b))/abs(value),
+		abs(da-float(fda))/abs(da),abs(db-float(fdb))/abs(db)]
+	maxdiff=max([maxdiff]+diffs)
+	print("n=",n," l=",l," a=",a," b=",b," x=",xpair)
+	print("d/da: ","{:.10E}".format(da)," FD: ","{:.10E}".format(float(fda)))
+	print("d/db: ","{:.10E}".format(db)," FD: ","{:.10E}".format(float(fdb)))
+	#Quadrature is only reliable over a modest number of oscillations
+	if xpair[1]*(a+b)<100:
+		qa=integrate.quad(IntegrandA,xpair[0],xpair[1],args=(n,l,a,b),limit=intlimit)[0]
+		qb=integrate.quad(IntegrandB,xpair[0],xpair[1],args=(n,l,a,b),limit=intlimit)[0]
+		print("Quadrature d/da: ","{:.10E}".format(qa)," d/db: ","{:.10E}".format(qb))
+		quaddiff=max(abs(da-qa)/abs(da),abs(db-qb)/abs(db))
+		maxquad=max(maxquad,quaddiff)
+		print("Quadrature Diff: ","{:.5E}".format(quaddiff))
+	print()
+
+print("Max relative difference from finite differences: ","{:.5E}".format(maxdiff))
+print("Max relative difference from quadrature: ","{:.5E}".format(maxquad))
+if maxdiff>1e-12 or maxquad>1e-8:
+	sys.exit("Gradient check failed")
@@ -0,0 +1,50 @@
+#! /usr/bin/python
+
+"""
+Script to check KCalc.CalculateGrid, which assembles the trig factors
+of every pair of wavenumbers by angle addition, against one
+KCalc.Calculate call per pair, and to compare their timings.
+The grids include nearly equal wavenumbers, where the angle addition
+for x(a-b) cancels digits that the precision check does not see.
+"""
+
+from __future__ import print_function
+import KCalc
+import numpy as np
+import sys
+import time
+
+KCalc.verbose=False
+
+#Testing values: (n, l, xpair, ks)
+cases=[(6,4,(1e-3,1e3),[0.01,0.1,1.0,10.0,50.0]),
+	(4,3,(0.1,5.0),[0.2,0.5,1.0,1.0+1e-8,1.7]),
+	(6,10,(1.0,20.0),[0.4,1.0,1.0+1e-8,1.0+2e-8,3.0]),
+	(4,0,(1e-3,1e3),[1.0,1.0+1e-8,1.0+1e-4,2.0])]
+
+maxdiff=0.0
+for n,l,xpair,ks in cases:
+	start=time.time()
+	grid=KCalc.CalculateGrid(xpair,l,n,ks)
+	end=time.time()
+	gdelta=end-start
+	start=time.time()
+	exact=[[KCalc.Calculate(xpair,l,n,a,b) for b in ks[i+1:]] for i,a in enumerate(ks)]
+	end=time.time()
+	cdelta=end-start
+	diff=0.0
+	for i in range(len(ks)):
+		if not np.isnan(grid[i,i]):
+			diff=np.inf
+		for j in range(i+1,len(ks)):
+			value=exact[i][j-i-1]
+			diff=max(diff,abs(grid[i,j]-value)/abs(value),abs(grid[j,i]-value)/abs(value))
+	maxdiff=max(maxdiff,diff)
+	print("n=",n," l=",l," x=",xpair," ks=",ks)
+	print("Max relative difference: ","{:.5E}".format(diff))
+	print("Grid Time: ",gdelta," Seconds, Calculate Time: ",cdelta," Seconds")
+	print()
+
+print("Max relative difference: ","{:.5E}".format(maxdiff))
+if maxdiff>1e-15:
+	sys.exit("CalculateGrid check failed")
@@ -0,0 +1,42 @@
+#! /usr/bin/python
+
+"""
+Script to check KCalc.CalculateMany, which evaluates the running
+integral over a grid of x at once, against one KCalc.Calculate call
+per grid point, and to compare their timings.
+"""
+
+from __future__ import print_function
+import KCalc
+import numpy as np
+import sys
+import time
+
+KCalc.verbose=False
+
+#Testing values: (n, l, a, b)
+cases=[(6,4,0.01,50.0),(4,0,0.3,1.7),(6,10,2.0,0.5),(4,7,1.0,1.0+1e-3)]
+xs=np.logspace(-3,3,25)
+
+maxdiff=0.0
+for n,l,a,b in cases:
+	start=time.time()
+	many=KCalc.CalculateMany(xs,l,n,a,b)
+	end=time.time()
+	mdelta=end-start
+	start=time.time()
+	single=[KCalc.Calculate((xs[0],x),l,n,a,b) for x in xs[1:]]
+	end=time.time()
+	sdelta=end-start
+	if many[0]!=0.0:
+		maxdiff=np.inf
+	diff=max([abs(m-s)/abs(s) for m,s in zip(many[1:],single)])
+	maxdiff=max(maxdiff,diff)
+	print("n=",n," l=",l," a=",a," b=",b)
+	print("Max relative difference: ","{:.5E}".format(diff))
+	print("Many Time: ",mdelta," Seconds, Calculate Time: ",sdelta," Seconds")
+	print()
+
+print("Max relative difference: ","{:.5E}".format(maxdiff))
+if maxdiff>1e-14:
+	sys.exit("CalculateMany check failed")
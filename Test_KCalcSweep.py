@@ -0,0 +1,83 @@
+#! /usr/bin/python
+
+"""
+Script to check KCalc.Sweep, which evaluates every l up to lmax from
+the Bessel form of the antiderivative and a recurrence in l, against
+the closed forms of KCalc.Calculate for l up to 10, against quadrature
+beyond, and to compare their timings.
+"""
+
+from __future__ import print_function
+import KCalc
+from mpmath import mp
+from scipy import integrate
+from scipy.special import spherical_jn as sphj
+import sys
+import time
+
+KCalc.verbose=False
+
+#Testing values against the closed forms: (n, a, b, xpair)
+#a=pi puts a*x1 near a zero of j_0, and 1.0, 1.0+1e-8 is nearly degenerate
+cases=[(6,0.01,50.0,(1e-3,1e3)),(4,0.3,1.7,(0.1,5.0)),(6,2.0,0.5,(1e-3,1e3)),
+	(4,1.3,0.4,(1.0,20.0)),(6,1.0,1.0+1e-8,(0.2,3.0)),(4,float(mp.pi),0.5,(1.0,2.0))]
+lmax=10
+
+#Testing values against quadrature, beyond the closed forms
+quadcases=[(2,0.3,1.7,(0.1,5.0)),(4,0.3,1.7,(0.1,5.0)),(6,1.3,0.4,(1.0,20.0))]
+quadlmax=20
+
+#Maximum number of quadrature subdivisions.
+intlimit=1000
+
+def BesselIntegrand(x,n,l,a,b):
+	return x**n*sphj(l,a*x)*sphj(l,b*x)
+
+failures=[]
+
+maxdiff=0.0
+for n,a,b,xpair in cases:
+	start=time.time()
+	sweep=KCalc.Sweep(xpair,lmax,n,a,b)
+	end=time.time()
+	sdelta=end-start
+	start=time.time()
+	exact=[KCalc.Calculate(xpair,l,n,a,b) for l in range(lmax+1)]
+	end=time.time()
+	cdelta=end-start
+	diff=max([abs(s-e)/abs(e) for s,e in zip(sweep,exact)])
+	maxdiff=max(maxdiff,diff)
+	print("n=",n," a=",a," b=",b," x=",xpair)
+	print("Max relative difference: ","{:.5E}".format(diff))
+	print("Sweep Time: ",sdelta," Seconds, Calculate Time: ",cdelta," Seconds")
+	print()
+print("Max relative difference from Calculate: ","{:.5E}".format(maxdiff))
+if maxdiff>1e-15:
+	failures.append("sweep differs from Calculate")
+
+maxquad=0.0
+for n,a,b,xpair in quadcases:
+	sweep=KCalc.Sweep(xpair,quadlmax,n,a,b)
+	for l in range(quadlmax+1):
+		quad=integrate.quad(BesselIntegrand,xpair[0],xpair[1],args=(n,l,a,b),limit=intlimit,epsabs=0)
+		maxquad=max(maxquad,abs(sweep[l]-quad[0])/abs(quad[0]))
+print("Max relative difference from quadrature up to l=",quadlmax,": ","{:.5E}".format(maxquad))
+if maxquad>1e-8:
+	failures.append("sweep differs from quadrature")
+
+#The n=2 form is the one used by K2Int
+poly=KCalc.Polynomial(0.3,1.7)
+k2=[KCalc.K2Int(l,5.0,poly)-KCalc.K2Int(l,0.1,poly) for l in range(1,lmax+1)]
+k2diff=max([abs(s-k)/abs(k) for s,k in zip(KCalc.Sweep((0.1,5.0),lmax,2,0.3,1.7)[1:],k2)])
+print("Max relative difference from K2Int: ","{:.5E}".format(k2diff))
+if k2diff>1e-12:
+	failures.append("n=2 sweep differs from K2Int")
+
+try:
+	KCalc.Sweep((0.1,5.0),lmax,5,0.3,1.7)
+	failures.append("odd n accepted")
+except ValueError:
+	pass
+
+if failures:
+	sys.exit("Sweep check failed: "+"; ".join(failures))
@@ -0,0 +1,143 @@
+#! /usr/bin/python
+
+"""
+In-process harness for the evaluation service. Fires concurrent
+requests, including duplicates, from several client threads and
+compares the answers with direct KCalc.Calculate calls, reporting
+how requests were coalesced and batched. Then checks that a failing
+call only fails its own request, and drives submit_async from a real
+asyncio event loop when asyncio is available (Python 3).
+"""
+
+from __future__ import print_function
+import KCalc
+import KService
+import sys
+import threading
+import time
+
+KCalc.verbose=False
+
+#Testing values: every client asks for the same grid of radii
+n=6
+l=4
+xpair=(1e-3,1e3)
+radii=[0.01,0.1,1.0,10.0,50.0]
+pairs=[(a,b) for a in radii for b in radii if a<b]
+nclients=8
+
+service=KService.Service(window=0.01)
+answers={}
+
+def Client(index):
+	requests=[(pair,service.submit(xpair,l,n,pair[0],pair[1])) for pair in pairs]
+	answers[index]=[(pair,request.result(timeout=600)) for pair,request in requests]
+
+start=time.time()
+clients=[threading.Thread(target=Client,args=(i,)) for i in range(nclients)]
+for client in clients:
+	client.start()
+for client in clients:
+	client.join()
+end=time.time()
+service.close()
+
+#Compare against direct evaluation
+maxdiff=0.0
+for index in answers:
+	for (a,b),result in answers[index]:
+		exact=KCalc.Calculate(xpair,l,n,a,b)
+		maxdiff=max(maxdiff,abs(result-exact)/abs(exact))
+
+print("Requests: ",nclients*len(pairs))
+print("Coalesced: ",service.coalesced)
+print("Batches: ",service.batches)
+print("Max relative difference: ","{:.5E}".format(maxdiff))
+print("Service Time: ",end-start," Seconds")
+print()
+
+#Error isolation: l=11 has no closed form, and shares a batch with valid calls.
+#The default backend reports the failure per call; Direct raises for the batch.
+def Direct(jobs):
+	return [KCalc.Calculate(*job) for job in jobs]
+
+failures=[]
+for name,backend in [("default",KService._Backend),("raising",Direct)]:
+	isolated=KService.Service(window=0.05,backend=backend)
+	good=isolated.submit(xpair,3,n,0.3,1.7)
+	bad=isolated.submit(xpair,11,n,0.3,1.7)
+	isolated.close()
+	try:
+		bad.result(timeout=600)
+		failures.append(name+" backend: l=11 did not fail")
+	except KeyError:
+		pass
+	exact=KCalc.Calculate(xpair,3,n,0.3,1.7)
+	if abs(good.result(timeout=600)-exact)>1e-15*abs(exact):
+		failures.append(name+" backend: l=3 result is wrong")
+	print("Isolation with",name,"backend, batches: ",isolated.batches)
+
+#Malformed backends: every request must still resolve, with an error
+def Nones(jobs):
+	return [None for job in jobs]
+
+def Short(jobs):
+	return Direct(jobs)[:-1]
+
+for name,backend in [("None",Nones),("short",Short)]:
+	broken=KService.Service(window=0.05,backend=backend)
+	requests=[broken.submit(xpair,l,n,a,b) for a,b in pairs[:3]]
+	broken.close()
+	for request in requests:
+		try:
+			request.result(timeout=60)
+			failures.append(name+" backend: a request did not fail")
+		except (TypeError,ValueError):
+			pass
+		except RuntimeError:
+			failures.append(name+" backend: a request never resolved")
+	if broken.pending:
+		failures.append(name+" backend: requests left pending")
+	print("Malformed",name,"backend handled")
+
+#Real event loop: the futures resolve while the loop keeps running other callbacks
+try:
+	import asyncio
+except ImportError:
+	asyncio=None
+if asyncio is None:
+	print("asyncio unavailable, submit_async not exercised")
+else:
+	loop=asyncio.new_event_loop()
+	ticks=[0]
+	def Tick():
+		ticks[0]+=1
+		loop.call_later(0.001,Tick)
+	loop.call_soon(Tick)
+	aservice=KService.Service(window=0.01)
+	futures=[aservice.submit_async(xpair,l,n,a,b,loop=loop) for a,b in pairs]
+	futures.append(aservice.submit_async(xpair,11,n,0.3,1.7,loop=loop))
+	#Without loop, submit_async binds to the loop it is called from
+	inloop=[]
+	loop.call_soon(lambda: inloop.append(aservice.submit_async(xpair,3,n,0.3,1.7)))
+	results=loop.run_until_complete(asyncio.gather(*futures,return_exceptions=True))
+	inloopresult=loop.run_until_complete(inloop[0])
+	aservice.close()
+	loop.close()
+	asyncdiff=0.0
+	for (a,b),result in zip(pairs,results[:-1]):
+		exact=KCalc.Calculate(xpair,l,n,a,b)
+		asyncdiff=max(asyncdiff,abs(result-exact)/abs(exact))
+	if not isinstance(results[-1],KeyError):
+		failures.append("async: l=11 did not fail")
+	if inloopresult!=KCalc.Calculate(xpair,3,n,0.3,1.7):
+		failures.append("async: running loop result differs")
+	if asyncdiff>1e-15:
+		failures.append("async: results differ")
+	if ticks[0]<2:
+		failures.append("async: event loop was blocked")
+	print("Async max relative difference: ","{:.5E}".format(asyncdiff))
+	print("Event loop ticks while waiting: ",ticks[0])
+
+if failures:
+	sys.exit("Service check failed: "+"; ".join(failures))
@@ -0,0 +1,80 @@
+#! /usr/bin/python
+
+"""
+Script to check KShared.CalculateShared against direct KCalc.Calculate
+calls on a 400-call batch, which must agree bit for bit, and to check
+that failed calls are reported by index, that workers are forked even
+when the default start method is spawn, and that they follow the
+verbosity set in the parent.
+"""
+
+from __future__ import print_function
+import KCalc
+import KShared
+import multiprocessing
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+KCalc.verbose=False
+
+#A spawned worker would rebuild the tables; the pool must fork regardless
+if hasattr(multiprocessing,'set_start_method'):
+	multiprocessing.set_start_method('spawn',force=True)
+
+#Testing values: every (n, l) over a few radii and integration ranges
+nlist=[4,6]
+llist=range(0,11)
+radii=[(0.01,50.0),(0.3,1.7),(2.0,0.5),(1.0,3.0)]
+xpairs=[(1e-3,1e3),(0.1,5.0),(1.0,20.0),(2.0,3.0),(10.0,100.0)]
+jobs=[(xpair,l,n,a,b) for n in nlist for l in llist for a,b in radii for xpair in xpairs][:400]
+
+failures=[]
+
+#Capture what the workers print, which must be nothing with verbose off
+sys.stdout.flush()
+capture=tempfile.TemporaryFile()
+saved=os.dup(1)
+os.dup2(capture.fileno(),1)
+try:
+	start=time.time()
+	results,errors=KShared.CalculateShared(jobs,processes=4)
+	end=time.time()
+finally:
+	sys.stdout.flush()
+	os.dup2(saved,1)
+	os.close(saved)
+capture.seek(0)
+printed=capture.read()
+capture.close()
+sdelta=end-start
+
+start=time.time()
+exact=np.array([KCalc.Calculate(*job) for job in jobs])
+end=time.time()
+cdelta=end-start
+mismatches=int(np.sum(results!=exact))
+print("Calls: ",len(jobs))
+print("Calls differing from Calculate: ",mismatches)
+print("Shared Time: ",sdelta," Seconds, Calculate Time: ",cdelta," Seconds")
+if mismatches or errors:
+	failures.append("results differ from Calculate")
+if printed:
+	failures.append("workers printed with verbose off")
+
+#Failed calls: a missing (n, l) and a == b, between two good calls
+bad=[((0.1,5.0),3,4,0.3,1.7),((0.1,5.0),11,4,0.3,1.7),((0.1,5.0),3,4,0.5,0.5),((1.0,20.0),5,6,2.0,0.5)]
+results,errors=KShared.CalculateShared(bad,processes=2,tile=1)
+print("Errors: ",dict([(i,repr(exc)) for i,exc in errors.items()]))
+if sorted(errors)!=[1,2] or not isinstance(errors[1],KeyError) or not isinstance(errors[2],ZeroDivisionError):
+	failures.append("errors not reported by index")
+if not (np.isnan(results[1]) and np.isnan(results[2])):
+	failures.append("failed calls are not nan")
+for i in [0,3]:
+	if results[i]!=KCalc.Calculate(*bad[i]):
+		failures.append("good call %d affected by failures" % i)
+
+if failures:
+	sys.exit("Shared-memory check failed: "+"; ".join(failures))
@@ -0,0 +1,80 @@
+#! /usr/bin/python
+
+"""
+Script to check Chebyshev surrogates built by KSurrogate against
+direct KCalc.Calculate calls: the error estimate of a table must cover
+the error found at random points of its domain, tables must survive a
+save and load, and lookups outside the domain or beyond the tolerance
+must fall back to exact evaluation.
+"""
+
+from __future__ import print_function
+import KCalc
+import KSurrogate
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+KCalc.verbose=False
+
+#Testing values
+n=4
+l=3
+xpair=(0.1,5.0)
+adomain=(0.2,0.8)
+bdomain=(1.0,3.0)
+npoints=200
+
+failures=[]
+
+start=time.time()
+table=KSurrogate.Build(xpair,l,n,adomain,bdomain)
+end=time.time()
+print("Build Time: ",end-start," Seconds")
+print("Error estimate: ","{:.5E}".format(table.abserr))
+
+#Save and load through a temporary file
+directory=tempfile.mkdtemp()
+try:
+	filename=os.path.join(directory,"tables.npz")
+	KSurrogate.Surrogate([table],table.abserr).save(filename)
+	surrogate=KSurrogate.Load(filename,table.abserr)
+finally:
+	shutil.rmtree(directory)
+loaded=surrogate.tables[table.key()][0]
+if not np.array_equal(loaded.coeffs,table.coeffs) or loaded.abserr!=table.abserr:
+	failures.append("tables differ after save and load")
+
+#Random points in the domain, uniform in log a and log b
+rng=np.random.RandomState(0)
+avals=np.exp(rng.uniform(np.log(adomain[0]),np.log(adomain[1]),npoints))
+bvals=np.exp(rng.uniform(np.log(bdomain[0]),np.log(bdomain[1]),npoints))
+maxerr=0.0
+start=time.time()
+approx=[surrogate.Calculate(xpair,l,n,a,b) for a,b in zip(avals,bvals)]
+end=time.time()
+for a,b,value in zip(avals,bvals,approx):
+	maxerr=max(maxerr,abs(value-KCalc.Calculate(xpair,l,n,a,b)))
+print("Max error at ",npoints," random points: ","{:.5E}".format(maxerr))
+print("Lookup Time: ",(end-start)/npoints," Seconds")
+if maxerr>table.abserr:
+	failures.append("error estimate exceeded")
+
+#Outside the domain the surrogate must evaluate exactly
+exact=KCalc.Calculate(xpair,l,n,0.1,2.0)
+if surrogate.Calculate(xpair,l,n,0.1,2.0)!=exact:
+	failures.append("no fallback outside the domain")
+
+#A coarse table whose estimate exceeds the tolerance must not be used
+coarse=KSurrogate.Build(xpair,l,n,adomain,bdomain,npts=(10,10))
+print("Coarse error estimate: ","{:.5E}".format(coarse.abserr))
+strict=KSurrogate.Surrogate([coarse],table.abserr)
+exact=KCalc.Calculate(xpair,l,n,0.5,2.0)
+if strict.Calculate(xpair,l,n,0.5,2.0)!=exact:
+	failures.append("table beyond the tolerance was used")
+
+if failures:
+	sys.exit("Surrogate check failed: "+"; ".join(failures))
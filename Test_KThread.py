@@ -0,0 +1,59 @@
+#! /usr/bin/python
+
+"""
+Script to check KThread.CalculateBatch against direct KCalc.Calculate
+calls on a batch of well and badly conditioned integrals, reporting
+how many calls fell back to exact evaluation, and checking that failed
+calls are reported by index without affecting the rest of the batch.
+"""
+
+from __future__ import print_function
+import KCalc
+import KThread
+import numpy as np
+import sys
+import time
+
+KCalc.verbose=False
+
+#Testing values: every (n, l) over a few radii and integration ranges
+nlist=[4,6]
+llist=range(0,11)
+radii=[(0.01,50.0),(0.3,1.7),(2.0,0.5),(1.0,3.0),(5.0,4.0)]
+xpairs=[(1e-3,1e3),(0.1,5.0),(1.0,20.0),(2.0,3.0),(10.0,100.0)]
+jobs=[(xpair,l,n,a,b) for n in nlist for l in llist for a,b in radii for xpair in xpairs]
+
+failures=[]
+
+start=time.time()
+results,fallbacks,errors=KThread.CalculateBatch(jobs)
+end=time.time()
+bdelta=end-start
+start=time.time()
+exact=[KCalc.Calculate(*job) for job in jobs]
+end=time.time()
+sdelta=end-start
+maxdiff=max([abs(r-e)/abs(e) for r,e in zip(results,exact)])
+print("Calls: ",len(jobs))
+print("Fallbacks: ",fallbacks)
+print("Max relative difference: ","{:.5E}".format(maxdiff))
+print("Batch Time: ",bdelta," Seconds, Calculate Time: ",sdelta," Seconds")
+if maxdiff>1e-13:
+	failures.append("results differ")
+if errors:
+	failures.append("unexpected errors "+repr(errors))
+
+#Failed calls: a missing (n, l) and a == b, between two good calls
+bad=[((0.1,5.0),3,4,0.3,1.7),((0.1,5.0),11,4,0.3,1.7),((0.1,5.0),3,4,0.5,0.5),((1.0,20.0),5,6,2.0,0.5)]
+results,fallbacks,errors=KThread.CalculateBatch(bad)
+print("Errors: ",dict([(i,repr(exc)) for i,exc in errors.items()]))
+if sorted(errors)!=[1,2] or not isinstance(errors[1],KeyError) or not isinstance(errors[2],ZeroDivisionError):
+	failures.append("errors not reported by index")
+if not (np.isnan(results[1]) and np.isnan(results[2])):
+	failures.append("failed calls are not nan")
+for i in [0,3]:
+	if abs(results[i]-KCalc.Calculate(*bad[i]))>1e-13*abs(results[i]):
+		failures.append("good call %d affected by failures" % i)
+
+if failures:
+	sys.exit("Batch check failed: "+"; ".join(failures))